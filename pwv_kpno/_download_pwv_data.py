@@ -20,23 +20,74 @@
 suominet.ucar.edu.
 """
 
+import json
 import os
-from datetime import datetime, timedelta
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Union
 from warnings import catch_warnings, simplefilter, warn
 
 import numpy as np
 import requests
-from astropy.table import Table, join, unique, vstack
+from astropy.table import MaskedColumn, Table, vstack
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .package_settings import settings
 
+# Maximum number of SuomiNet data files to download at once
+_MAX_DOWNLOAD_WORKERS = 8
+
+# Session shared by all downloads so connections to SuomiNet are reused.
+# The connection pool is sized to match the number of download threads.
+# Transient connection errors and server errors are retried with exponential
+# backoff. If retries are exhausted the final response is returned so that
+# the error is raised by response.raise_for_status
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=_MAX_DOWNLOAD_WORKERS,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',),
+        raise_on_status=False
+    )
+))
+
+# Number of bytes to write to disk at a time when downloading data files
+_DOWNLOAD_CHUNK_SIZE = 1 << 18
+
+# Local file names and URLs for each SuomiNet data release. The order of this
+# tuple (global, daily, then hourly) determines the order in which data from
+# each release takes precedence in _download_data_for_year
+_SUOMI_RELEASES = (
+    # Global daily releases:
+    ('{0}gl_{1}.plt',
+     'https://www.suominet.ucar.edu/data/staYrDayGlob/{0}_{1}global.plt'),
+
+    # CONUS daily data releases:
+    ('{0}dy_{1}.plt',
+     'https://www.suominet.ucar.edu/data/staYrDay/{0}pp_{1}.plt'),
+
+    # CONUS hourly data releases:
+    ('{0}hr_{1}.plt',
+     'https://www.suominet.ucar.edu/data/staYrHr/{0}nrt_{1}.plt'),
+)
 
-@np.vectorize
-def _suomi_date_to_timestamp(year: int, days_str: str) -> float:
+
+def _suomi_date_to_timestamp(
+        year: int,
+        days_str: Union[str, np.ndarray]) -> Union[float, np.ndarray]:
     """Convert the SuomiNet date format into UTC timestamp
 
     SuomiNet dates are stored as decimal days in a given year. For example,
-    February 1st, 00:15 would be 36.01042.
+    February 1st, 00:15 would be 36.01042. Dates can be given individually
+    or as an array, in which case they are converted in a single pass.
 
     Args:
         year: The year of the desired timestamp
@@ -46,50 +97,158 @@ def _suomi_date_to_timestamp(year: int, days_str: str) -> float:
         The seconds from UTC epoch to the provided date as a float
     """
 
-    jan_1st = datetime(year=year, month=1, day=1)
-    date = jan_1st + timedelta(days=float(days_str) - 1)
+    jan_1st = (datetime(year, 1, 1) - datetime(1970, 1, 1)).total_seconds()
+
+    # Round to whole microseconds (as timedelta does) before dropping seconds
+    days = np.asarray(days_str, dtype=float)
+    microseconds = np.rint((days - 1) * 86400e6)
+    minutes = np.floor_divide(microseconds, 60e6)
+
+    # Correct for round off error in SuomiNet date format by rounding up
+    # to the nearest multiple of five minutes
+    minutes = np.ceil(minutes / 5) * 5
+    return jan_1st + minutes * 60
+
+
+def _in_intervals(values: np.ndarray, intervals: list) -> np.ndarray:
+    """Return whether values fall inside any of the given open intervals
+
+    Intervals are checked using a binary search over their start values
+    instead of comparing every value against every interval.
+
+    Args:
+        values: The values to check
+        intervals: A list of (start, end) pairs
+
+    Returns:
+        A boolean array that is True for values inside any interval
+    """
+
+    if not len(intervals):
+        return np.zeros(len(values), dtype=bool)
 
-    # Correct for round off error in SuomiNet date format
-    date = date.replace(second=0, microsecond=0)
-    while date.minute % 5:
-        date += timedelta(minutes=1)
+    starts, ends = np.array(sorted(intervals), dtype=float).T
 
-    timestamp = (date - datetime(1970, 1, 1)).total_seconds()
-    return timestamp
+    # Each value only needs to be checked against the furthest reaching
+    # interval among those that start before it
+    ends = np.maximum.accumulate(ends)
+    last_start = np.searchsorted(starts, values, side='left') - 1
+    return (last_start >= 0) & (values < ends[np.maximum(last_start, 0)])
 
 
-def _apply_data_cuts(data: Table, site_id: str) -> Table:
+def _apply_data_cuts(
+        data: Table, site_id: str, site_cuts: dict = None) -> Table:
     """Apply data cuts from settings to a table of SuomiNet measurements
 
     Args:
         data: A table containing data from a SuomiNet data file
         site_id: The site to apply data cuts for
-        
+        site_cuts: The site's data cuts (Default: read from settings)
+
     Returns:
         A copy of the data with applied data cuts
     """
 
-    data = data[data[site_id] > 0]
+    if site_cuts is None:
+        site_cuts = settings.data_cuts.get(site_id, {})
 
-    # SuomiNet rounds their error and can report an error of zero
-    # We compensate by adding an error of 0.025
-    data[site_id + '_err'] = np.round(data[site_id + '_err'] + 0.025, 3)
+    # Combine all cuts into a single mask so the table is only copied once
+    keep = np.asarray(data[site_id]) > 0
+    for param_name, cut_list in site_cuts.items():
+        column = np.asarray(data[param_name])
 
-    data_cuts = settings.data_cuts
-    if site_id not in data_cuts:
-        return data
+        # Data cuts on dates specify what data to ignore
+        if param_name == 'date':
+            keep &= ~_in_intervals(column, cut_list)
+            continue
 
-    for param_name, cut_list in data_cuts[site_id].items():
+        # All others specify what data to include
         for start, end in cut_list:
-            indices = (start < data[param_name]) & (data[param_name] < end)
+            keep &= (start < column) & (column < end)
+
+    data = data[keep]
+
+    # SuomiNet rounds their error and can report an error of zero
+    # We compensate by adding an error of 0.025. The selection above returns
+    # a copy of the data, so the column can be updated in place.
+    pwv_err = data[site_id + '_err']
+    np.add(pwv_err, 0.025, out=pwv_err)
+    np.round(pwv_err, 3, out=pwv_err)
+
+    return data
+
+
+@lru_cache(maxsize=128)
+def _parse_file(path: str, names: tuple, usecols: tuple,
+                mtime: int, size: int, cuts_only: bool) -> np.ndarray:
+    """Parse columns from a SuomiNet data file
+
+    Results are cached using the file's modification time and size, so
+    unchanged files are only parsed once. The returned array is read only.
+
+    Args:
+        path: File path to be read
+        names: Names of the columns to parse
+        usecols: Indices of the columns to parse
+        mtime: The modification time of path in nanoseconds
+        size: The size of path in bytes
+        cuts_only: Whether columns after the PWV error are only used for cuts
+
+    Returns:
+        A structured array with dates converted to UNIX timestamps
+    """
+
+    # Timestamps and PWV values are kept in double precision since they are
+    # written to the master PWV table. Columns that are only used for data
+    # cuts are reported by SuomiNet to one decimal place, so they are parsed
+    # in single precision. Otherwise they are returned to the user and are
+    # kept in double precision.
+    # np.loadtxt is used over np.genfromtxt since it parses files in C
+    # (numpy >= 1.23) and SuomiNet files never contain missing fields.
+    dtype = [(name, float) for name in names[:3]]
+    aux_type = np.float32 if cuts_only else float
+    dtype += [(name, aux_type) for name in names[3:]]
+    data = np.loadtxt(path, usecols=usecols, dtype=dtype, ndmin=1)
+
+    # Drop every row whose date is duplicated. This only sorts the date
+    # column rather than the full table (as astropy.table.unique would).
+    _, inverse, counts = np.unique(
+        data['date'], return_inverse=True, return_counts=True)
+
+    data = data[counts[inverse] == 1]
+    if len(data):
+        year = int(path[-8: -4])
+        data['date'] = _suomi_date_to_timestamp(year, data['date'])
+
+    data.flags.writeable = False
+    return data
+
+
+@lru_cache(maxsize=128)
+def _parse_file_with_cuts(path: str, names: tuple, usecols: tuple, mtime: int,
+                          size: int, cuts_only: bool, cuts: str) -> np.ndarray:
+    """Parse columns from a SuomiNet data file and apply data cuts
 
-            # Data cuts on dates specify what data to ignore
-            # All others specify what data to include
-            if param_name == 'date':
-                indices = ~indices
+    Results are cached using the same arguments as ``_parse_file`` and the
+    applied data cuts, so changing the data cuts in the package settings
+    never returns stale results. The returned array is read only.
+
+    Args:
+        path: File path to be read
+        names: Names of the columns to parse
+        usecols: Indices of the columns to parse
+        mtime: The modification time of path in nanoseconds
+        size: The size of path in bytes
+        cuts_only: Whether columns after the PWV error are only used for cuts
+        cuts: The data cuts for the file's site as a JSON string
 
-            data = data[indices]
+    Returns:
+        A structured array with data cuts applied
+    """
 
+    data = Table(_parse_file(path, names, usecols, mtime, size, cuts_only))
+    data = _apply_data_cuts(data, names[1], json.loads(cuts)).as_array()
+    data.flags.writeable = False
     return data
 
 
@@ -118,21 +277,24 @@ def _read_file(path: str, apply_cuts: bool = True, pwv_only: bool = True):
     names = ['date', site_id, site_id + '_err', 'ZenithDelay',
              'SrfcPress', 'SrfcTemp', 'SrfcRH']
 
-    data = np.genfromtxt(path,
-                         names=names,
-                         usecols=range(0, len(names)),
-                         dtype=[float for _ in names])
+    # When only returning PWV data, skip parsing columns not used by data cuts
+    site_cuts = settings.data_cuts.get(site_id, {}) if apply_cuts else {}
+    usecols = range(len(names))
+    if pwv_only:
+        usecols = [i for i in usecols if i < 3 or names[i] in site_cuts]
+        names = [names[i] for i in usecols]
 
-    data = Table(data)
-    if data:
-        data = unique(data, keys='date', keep='none')
-        year = int(path[-8: -4])
-        data['date'] = _suomi_date_to_timestamp(year, data['date'])
+    file_stats = os.stat(path)
+    parse_args = (path, tuple(names), tuple(usecols),
+                  file_stats.st_mtime_ns, file_stats.st_size, pwv_only)
 
     if apply_cuts:
-        # Important: _apply_data_cuts expects column 'date' to have already
-        # been converted from the suominet format to timestamps
-        data = _apply_data_cuts(data, site_id)
+        # Data cuts are serialized so they can be part of the cache key
+        cuts = json.dumps(site_cuts, sort_keys=True)
+        data = Table(_parse_file_with_cuts(*parse_args, cuts))
+
+    else:
+        data = Table(_parse_file(*parse_args))
 
     if pwv_only:
         data = data['date', site_id, site_id + '_err']
@@ -140,92 +302,332 @@ def _read_file(path: str, apply_cuts: bool = True, pwv_only: bool = True):
     return data
 
 
-def _download_data_for_site(year: int, site_id: str, timeout: float = None):
-    """Download SuomiNet data for a given year and SuomiNet id
+def _binary_table_path(path: str) -> str:
+    """Return the path of the binary copy of a csv table of PWV data"""
+
+    return os.path.splitext(path)[0] + '.fits'
+
 
-    For a given year and SuomiNet id, download data from the corresponding GPS
-    receiver. Files are downloaded from both global, daily, and hourly data
-    releases. Any existing data files are overwritten.
+def _mask_missing_values(data: Table) -> Table:
+    """Mask NaN values in a table of PWV data read from its binary copy
+
+    Missing values are written to the binary copy as NaN. Astropy masks
+    these values when reading FITS files starting with version 5.0, but
+    older versions return them as plain floats.
 
     Args:
-        year: A year to download data for
-        site_id: A SuomiNet receiver id code (eg. KITT)
-        timeout: Optional seconds to wait while connecting to SuomiNet
+        data: A table read from a binary PWV table
 
     Returns:
-        A list of file paths containing downloaded data
+        The same table with NaN values masked
     """
 
-    # CONUS daily data releases:
-    day_path = os.path.join(settings._suomi_dir, '{0}dy_{1}.plt')
-    day_url = 'https://www.suominet.ucar.edu/data/staYrDay/{0}pp_{1}.plt'
+    for column in list(data.itercols()):
+        if column.dtype.kind != 'f' or isinstance(column, MaskedColumn):
+            continue
 
-    # CONUS hourly data releases:
-    hour_path = os.path.join(settings._suomi_dir, '{0}hr_{1}.plt')
-    hour_url = 'https://www.suominet.ucar.edu/data/staYrHr/{0}nrt_{1}.plt'
+        is_missing = np.isnan(column)
+        if is_missing.any():
+            data[column.name] = MaskedColumn(column, mask=is_missing)
 
-    # Global daily releases:
-    global_day_path = os.path.join(settings._suomi_dir, '{0}gl_{1}.plt')
-    global_day_url = 'https://www.suominet.ucar.edu/data/staYrDayGlob/{0}_{1}global.plt'
+    return data
 
-    # Function should guarantee the return order global, day, then hourly
-    download_data = zip(
-        (global_day_path, day_path, hour_path),
-        (global_day_url, day_url, hour_url)
-    )
 
-    downloaded_paths = []
-    for general_path, url in download_data:
-        with catch_warnings():
-            simplefilter('ignore')
-            response = requests.get(url.format(site_id, year),
-                                    timeout=timeout, verify=False)
+def _read_pwv_table(path: str) -> Table:
+    """Read a csv table of PWV data, preferring its binary copy if available
 
-        # 404 error code means SuomiNet has no data file to download
-        if response.status_code != 404:
-            response.raise_for_status()
-            path = general_path.format(site_id, year)
-            with open(path, 'wb') as ofile:
-                ofile.write(response.content)
+    The binary copy written by _write_pwv_table is only used if it is at
+    least as recent as the csv file.
+
+    Args:
+        path: The path of the csv file to read
+
+    Returns:
+        An astropy Table with data from path
+    """
 
-            downloaded_paths.append(path)
+    binary_path = _binary_table_path(path)
+    try:
+        use_binary = os.stat(binary_path).st_mtime >= os.stat(path).st_mtime
 
-    return downloaded_paths
+    except FileNotFoundError:
+        use_binary = False
 
+    if use_binary:
+        return _mask_missing_values(Table.read(binary_path, format='fits'))
 
-def _download_data_for_year(yr: int, timeout: float = None):
+    # PWV tables are always plain csv files, so skip astropy's format
+    # guessing and go straight to its C based csv reader
+    return Table.read(path, format='ascii.fast_csv', guess=False)
+
+
+def _write_pwv_table(data: Table, path: str):
+    """Write a table of PWV data to a csv file along with a binary copy
+
+    Args:
+        data: The table to write
+        path: The path of the csv file to write
+    """
+
+    # Explicitly request astropy's C writer, which is over ten times
+    # faster than the pure Python writer it would otherwise fall back to
+    data.write(path, format='ascii.csv', fast_writer=True, overwrite=True)
+    data.write(_binary_table_path(path), format='fits', overwrite=True)
+
+
+def _load_http_cache() -> dict:
+    """Return cached HTTP headers for previously downloaded SuomiNet files
+
+    Returns:
+        A dictionary mapping file names to their 'etag' and 'last_modified'
+    """
+
+    try:
+        with open(settings._http_cache_path, 'r') as ofile:
+            return json.load(ofile)
+
+    except (FileNotFoundError, json.JSONDecodeError):
+        return dict()
+
+
+def _save_http_cache(http_cache: dict):
+    """Write cached HTTP headers for downloaded SuomiNet files to disk
+
+    Args:
+        http_cache: A dictionary returned by _load_http_cache
+    """
+
+    with open(settings._http_cache_path, 'w') as ofile:
+        json.dump(http_cache, ofile, indent=4, sort_keys=True)
+
+
+def _conditional_headers(path: str, http_cache: dict) -> dict:
+    """Return headers for a conditional GET request of a SuomiNet file
+
+    Conditional headers are only included if the file exists on disk with
+    the same size it was downloaded with, so a "not modified" response always
+    refers to usable local data. Files without cached headers (e.g., files
+    distributed with the package) are always downloaded, since their
+    modification time does not reflect when they changed on the server.
+
+    Args:
+        path: The local path of the file being downloaded
+        http_cache: A dictionary returned by _load_http_cache
+
+    Returns:
+        A dictionary of request headers
+    """
+
+    headers = {'Accept-Encoding': 'gzip, deflate'}
+    try:
+        file_stats = os.stat(path)
+
+    except FileNotFoundError:
+        return headers
+
+    cached = http_cache.get(os.path.basename(path))
+    if cached is None or file_stats.st_size != cached.get('size'):
+        return headers
+
+    if cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+
+    if cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+
+    return headers
+
+
+def _download_file(
+        url: str, path: str, timeout: float = None,
+        http_cache: dict = None) -> int:
+    """Download a single SuomiNet data file
+
+    Any existing file at the given path is overwritten. If an HTTP cache is
+    provided, the file is not downloaded again if it has not changed on the
+    server since it was last downloaded. The cache is updated in place.
+
+    Args:
+        url: The URL of the file to download
+        path: The local path to write the file to
+        timeout: Optional seconds to wait while connecting to SuomiNet
+        http_cache: Optional dictionary returned by _load_http_cache
+
+    Returns:
+        The status code of the server response (200, 304, or 404)
+    """
+
+    if http_cache is None:
+        http_cache = dict()
+
+    # Warnings are suppressed by the caller rather than here, since this
+    # function runs on worker threads and catch_warnings is not thread safe
+    response = _SESSION.get(url,
+                            headers=_conditional_headers(path, http_cache),
+                            timeout=timeout, verify=False, stream=True)
+
+    with response:
+        # 404 error code means SuomiNet has no data file to download
+        # 304 error code means the local file is already up to date
+        if response.status_code in (304, 404):
+            return response.status_code
+
+        response.raise_for_status()
+
+        # Copy the undecoded stream straight to disk in large blocks,
+        # letting urllib3 handle any content encoding. Data is written to a
+        # temporary file first so an interrupted download never replaces
+        # (or masquerades as) a complete data file.
+        response.raw.decode_content = True
+        part_path = path + '.part'
+        try:
+            with open(part_path, 'wb') as ofile:
+                shutil.copyfileobj(response.raw, ofile, _DOWNLOAD_CHUNK_SIZE)
+                bytes_written = ofile.tell()
+
+            # Older versions of urllib3 end a short response body without
+            # an error, so make sure the full file was received. The content
+            # length only describes the decoded file if it was not encoded.
+            content_length = response.headers.get('Content-Length')
+            is_encoded = response.headers.get(
+                'Content-Encoding', 'identity') != 'identity'
+
+            if (content_length is not None and not is_encoded
+                    and bytes_written != int(content_length)):
+                raise IOError(
+                    'Incomplete download of {}: received {} of {} bytes'
+                    .format(url, bytes_written, content_length))
+
+            os.replace(part_path, path)
+
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+            raise
+
+        # Match the file's modification time to the server's copy
+        last_modified = response.headers.get('Last-Modified')
+        try:
+            mtime = parsedate_to_datetime(last_modified).timestamp()
+            os.utime(path, (mtime, mtime))
+
+        except (TypeError, ValueError):
+            pass  # Header is missing or malformed
+
+        http_cache[os.path.basename(path)] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': last_modified,
+            'size': os.path.getsize(path)
+        }
+
+        return response.status_code
+
+
+def _download_data_for_year(
+        yr: int, timeout: float = None, skip_unmodified: bool = False):
     """Download and return data for a given year from each SuomiNet receiver
 
     Downloaded data for each SuomiNet receiver. Return this data as an
     astropy table with all available data from the daily data releases
     supplemented by any hourly release data.
 
+    If skip_unmodified is True and no data file has changed on the server
+    since it was last downloaded, the local files are not parsed and None is
+    returned instead.
+
     Args:
         yr: The year of the desired data
         timeout: Optional seconds to wait while connecting to SuomiNet
+        skip_unmodified: Return None if no files have changed (Default: False)
 
     Returns:
         An astropy Table of the combined downloaded data for the given year.
     """
 
-    combined_data = []
+    # Files are downloaded from the global, daily, and hourly data releases
+    # for each receiver. The order of download_tasks guarantees that files
+    # for each receiver are listed in the order global, day, then hourly.
+    suomi_dir = settings._suomi_dir
+    download_tasks = []
     for site_id in settings.receivers:
-        file_paths = _download_data_for_site(yr, site_id, timeout)
-        if file_paths:
-            site_data = vstack([_read_file(path) for path in file_paths])
+        for file_name, url in _SUOMI_RELEASES:
+            path = os.path.join(suomi_dir, file_name.format(site_id, yr))
+            download_tasks.append((site_id, url.format(site_id, yr), path))
+
+    # Downloads are network bound, so all files are fetched concurrently.
+    # Warning filters are process wide and catch_warnings is not thread safe,
+    # so suppress warnings here (instead of per request) to make sure
+    # the original filters are restored once all threads are done.
+    http_cache = _load_http_cache()
+    try:
+        with catch_warnings(), \
+                ThreadPoolExecutor(_MAX_DOWNLOAD_WORKERS) as executor:
+            simplefilter('ignore')
+            futures = [
+                executor.submit(_download_file, url, path, timeout, http_cache)
+                for _, url, path in download_tasks
+            ]
+
+            # Fail fast by canceling any pending downloads after an error
+            try:
+                for future in as_completed(futures):
+                    future.result()
 
-            if site_data:
-                unique_data = unique(site_data, keys=['date'], keep='first')
-                combined_data.append(unique_data)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+    finally:
+        # Keep cache entries for any files that were successfully downloaded
+        _save_http_cache(http_cache)
+
+    status_codes = [future.result() for future in futures]
+    if skip_unmodified and 200 not in status_codes:
+        return None
+
+    downloaded_paths = {site_id: [] for site_id in settings.receivers}
+    for (site_id, _, path), status_code in zip(download_tasks, status_codes):
+        if status_code != 404:
+            downloaded_paths[site_id].append(path)
+
+    combined_data = []
+    for file_paths in downloaded_paths.values():
+        if not file_paths:
+            continue
+
+        # Stack data from each release and keep the first measurement for
+        # each date (np.unique returns the index of first occurrences)
+        file_data = [_read_file(path) for path in file_paths]
+        colnames = file_data[0].colnames
+        columns = [np.concatenate([np.asarray(data[col]) for data in file_data])
+                   for col in colnames]
+
+        # Keep receiver data as plain arrays until the final table is built
+        _, first_indices = np.unique(columns[0], return_index=True)
+        if len(first_indices):
+            combined_data.append(
+                {col: column[first_indices]
+                 for col, column in zip(colnames, columns)})
 
     if not combined_data:
         warn('No SuomiNet data found for year {}'.format(yr), RuntimeWarning)
         return Table()
 
-    out_data = combined_data.pop()
-    while combined_data:
-        out_data = join(out_data, combined_data.pop(),
-                        join_type='outer', keys=['date'])
+    # Align each receiver's (unique and sorted) dates onto the union of all
+    # dates instead of performing repeated outer joins
+    all_dates = np.unique(np.concatenate(
+        [site_data['date'] for site_data in combined_data]))
+
+    out_data = Table([all_dates], names=['date'])
+    for site_data in combined_data:
+        indices = np.searchsorted(all_dates, site_data.pop('date'))
+        for colname, values in site_data.items():
+            column = np.ma.masked_all(len(all_dates), values.dtype)
+            column[indices] = values
+            out_data[colname] = column
 
     return out_data
 
@@ -237,7 +639,7 @@ def _get_local_data():
     """
 
     if os.path.exists(settings._pwv_measured_path):
-        return Table.read(settings._pwv_measured_path)
+        return _read_pwv_table(settings._pwv_measured_path)
 
     else:
         col_names = ['date']
@@ -248,15 +650,37 @@ def _get_local_data():
         return Table(names=col_names)
 
 
-def update_local_data(year: int, timeout: bool = None):
-    """Download data from SuomiNet for a given year and update the master table
+def _has_data_for_year(data: Table, year: int) -> bool:
+    """Return whether a table of PWV measurements has data for a given year
+
+    Args:
+        data: A table of PWV measurements with timestamps in column 'date'
+        year: The year to check for
+
+    Returns:
+        A boolean
+    """
+
+    epoch = datetime(1970, 1, 1)
+    start = (datetime(year, 1, 1) - epoch).total_seconds()
+    end = (datetime(year + 1, 1, 1) - epoch).total_seconds()
+    dates = np.asarray(data['date'])
+    return bool(np.any((start <= dates) & (dates < end)))
+
+
+def _add_data_for_year(
+        local_data: Table, year: int, timeout: float = None
+) -> Union[Table, None]:
+    """Download data from SuomiNet for a given year and merge it into a table
 
     Args:
+        local_data: A table of PWV measurements to add data to
         year: The year to update data for
         timeout: Optional seconds to wait while connecting to SuomiNet
 
     Returns:
-        A boolean representing whether any data was downloaded
+        The updated table, the given table if it is already up to date, or
+        None if there is no data for the given year
     """
 
     # Determine what years to download
@@ -265,18 +689,43 @@ def update_local_data(year: int, timeout: bool = None):
             'Cannot download data for years greater than the current year.'
         )
 
-    # Get any local data that has already been downloaded
-    local_data = _get_local_data()
+    # Download new data from SuomiNet. If the local data already covers the
+    # given year and nothing has changed on the server there is nothing to do
+    new_data = _download_data_for_year(
+        year, timeout, skip_unmodified=_has_data_for_year(local_data, year))
 
-    # Download new data from SuomiNet
-    new_data = _download_data_for_year(year, timeout)
-    stacked_tables = vstack([local_data, new_data])
-    if stacked_tables:
-        updated_data = unique(stacked_tables, keys=['date'], keep='last')
-
-        # Update local files
-        updated_data.write(settings._pwv_measured_path, overwrite=True)
-        return True
+    # New data takes precedence over local data with the same date. A value
+    # of None means no file has changed, so the local data is up to date.
+    if new_data:
+        is_new_date = ~np.isin(local_data['date'], new_data['date'])
+        updated_data = vstack([local_data[is_new_date], new_data])
+        updated_data.sort('date')
 
     else:
+        updated_data = local_data
+
+    return updated_data if updated_data else None
+
+
+def update_local_data(year: int, timeout: bool = None):
+    """Download data from SuomiNet for a given year and update the master table
+
+    Args:
+        year: The year to update data for
+        timeout: Optional seconds to wait while connecting to SuomiNet
+
+    Returns:
+        A boolean representing whether any data was downloaded
+    """
+
+    # Get any local data that has already been downloaded
+    local_data = _get_local_data()
+    updated_data = _add_data_for_year(local_data, year, timeout)
+    if updated_data is None:
         return False
+
+    # Update local files only if anything changed
+    if updated_data is not local_data:
+        _write_pwv_table(updated_data, settings._pwv_measured_path)
+
+    return True
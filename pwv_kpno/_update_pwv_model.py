@@ -28,12 +28,61 @@ from datetime import datetime
 
 import numpy as np
 from astropy.table import Table
-from scipy.odr import ODR, RealData, polynomial
 
-from ._download_pwv_data import update_local_data
+from ._download_pwv_data import (_add_data_for_year, _get_local_data,
+                                  _read_pwv_table, _write_pwv_table)
 from .package_settings import settings
 
-warnings.filterwarnings("ignore", message='Empty data detected for ODR instance.')
+# Convergence criteria for the iterative solution of the linear ODR problem
+_FIT_RTOL = 1e-15
+_FIT_MAX_ITER = 100
+
+
+def _fit_line(x: np.ndarray, y: np.ndarray, sx: np.ndarray, sy: np.ndarray):
+    """Fit a line to data with uncertainties in both x and y
+
+    Solves the weighted orthogonal distance regression problem for a first
+    order polynomial using the iterative method of York et al. (2004). This
+    minimizes the same objective as ``scipy.odr`` with a linear model, but
+    each iteration is a handful of vectorized sums.
+
+    Args:
+        x: The independent variable of the regression
+        y: The dependent variable of the regression
+        sx: Standard deviations of x
+        sy: Standard deviations of y
+
+    Returns:
+        The y-intercept of the fit
+        The slope of the fit
+    """
+
+    # As with scipy.odr, return the initial guess if there is too little data
+    intercept, slope = 0., 1.
+    if len(x) < 2:
+        return intercept, slope
+
+    weight_x = 1 / np.square(sx)
+    weight_y = 1 / np.square(sy)
+    for _ in range(_FIT_MAX_ITER):
+        weights = weight_x * weight_y / (weight_x + slope ** 2 * weight_y)
+        x_mean = np.dot(weights, x) / weights.sum()
+        y_mean = np.dot(weights, y) / weights.sum()
+        u, v = x - x_mean, y - y_mean
+
+        beta = weights * (u / weight_y + slope * v / weight_x)
+        beta *= weights
+        new_slope = np.dot(beta, v) / np.dot(beta, u)
+        converged = abs(new_slope - slope) <= _FIT_RTOL * abs(new_slope)
+        slope = new_slope
+        if converged or not np.isfinite(slope):
+            break
+
+    intercept = y_mean - slope * x_mean
+    if not (np.isfinite(slope) and np.isfinite(intercept)):
+        raise RuntimeError('Numerical error detected while fitting PWV data')
+
+    return intercept, slope
 
 
 def _linear_regression(x: np.array, y: np.array, sx: np.array, sy: np.array):
@@ -60,23 +109,24 @@ def _linear_regression(x: np.array, y: np.array, sx: np.array, sy: np.array):
         return y, sy
 
     # Fit data with orthogonal distance regression (ODR)
-    indices = ~np.logical_or(x.mask, y.mask)
-    data = RealData(x=x[indices], y=y[indices], sx=sx[indices], sy=sy[indices])
-    odr = ODR(data, polynomial(1), beta0=[0., 1.])
-    fit_results = odr.run()
-
-    fit_fail = 'Numerical error detected' in fit_results.stopreason
-    if fit_fail:
-        raise RuntimeError(fit_results.stopreason)
-
-    # Apply the linear regression
-    b, m = fit_results.beta
-    applied_fit = m * x + b
-    applied_fit.mask = np.logical_or(x.mask, applied_fit <= 0)
-
-    std = np.ma.std(y[indices] - m * x[indices] - b)
-    error = np.ma.zeros(applied_fit.shape) + std
-    error.mask = applied_fit.mask
+    # Select the overlapping measurements once as plain (unmasked) arrays
+    indices = ~(np.ma.getmaskarray(x) | np.ma.getmaskarray(y))
+    x_fit = np.ma.getdata(x)[indices]
+    y_fit = np.ma.getdata(y)[indices]
+    b, m = _fit_line(x_fit, y_fit,
+                     np.asarray(sx)[indices], np.asarray(sy)[indices])
+
+    # Apply the linear regression to the underlying data in a single pass
+    # and build the mask directly, avoiding masked array arithmetic
+    fit_values = np.multiply(np.ma.getdata(x), m, dtype=float)
+    fit_values += b
+    fit_mask = np.ma.getmaskarray(x) | (fit_values <= 0)
+    applied_fit = np.ma.array(fit_values, mask=fit_mask)
+
+    # As with the masked standard deviation, there is no scatter to report
+    # when the receivers never overlap
+    std = np.std(y_fit - m * x_fit - b) if indices.any() else 0.
+    error = np.ma.array(np.full(fit_values.shape, std), mask=fit_mask)
 
     return applied_fit, error
 
@@ -95,7 +145,10 @@ def _calc_avg_pwv_model(pwv_data: Table):
     off_site_receivers = settings.supplement_rec
     primary_rec = settings.primary_rec
 
-    pwv_arrays, err_arrays = [], []
+    # Accumulate the models from each receiver instead of stacking them
+    pwv_sum = np.zeros(len(pwv_data))
+    sum_quad = np.zeros(len(pwv_data))
+    n = np.zeros(len(pwv_data), dtype=int)
     for receiver in off_site_receivers:
         mod_pwv, mod_err = _linear_regression(
             x=pwv_data[receiver],
@@ -103,66 +156,86 @@ def _calc_avg_pwv_model(pwv_data: Table):
             sx=pwv_data[receiver + '_err'],
             sy=pwv_data[primary_rec + '_err']
         )
-        pwv_arrays.append(mod_pwv)
-        err_arrays.append(mod_err)
 
-    modeled_pwv = np.ma.vstack(pwv_arrays)
-    modeled_err = np.ma.vstack(err_arrays)
+        has_model = ~np.ma.getmaskarray(mod_pwv)
+        pwv_sum += np.where(has_model, mod_pwv.data, 0)
+        # np.ma.filled may return the caller's buffer, so it is not reused
+        sum_quad += np.square(np.ma.filled(mod_err, 0))
+        n += has_model
 
-    if np.all(modeled_pwv.mask):
+    no_model = n == 0
+    if np.all(no_model):
         warnings.warn('No overlapping PWV data between primary and secondary '
                       'receivers. Cannot model PWV for times when primary '
                       'receiver is offline')
 
-    # Average PWV models from different sites
-    avg_pwv = np.ma.average(modeled_pwv, axis=0)
-    sum_quad = np.ma.sum(modeled_err ** 2, axis=0)
-    n = len(off_site_receivers) - np.sum(modeled_pwv.mask, axis=0)
-    avg_pwv_err = np.ma.divide(np.ma.sqrt(sum_quad), n)
-    avg_pwv_err.mask = avg_pwv.mask  # np.ma.divide throws off the mask
+    # Average PWV models from different sites. The accumulators are no
+    # longer needed, so they are reused to hold the results.
+    n_models = np.maximum(n, 1)  # Avoid dividing by zero where fully masked
+    pwv_sum /= n_models
+    np.sqrt(sum_quad, out=sum_quad)
+    sum_quad /= n_models
+
+    avg_pwv = np.ma.array(pwv_sum, mask=no_model)
+    avg_pwv_err = np.ma.array(sum_quad, mask=no_model)
 
     return avg_pwv, avg_pwv_err
 
 
-def _create_new_pwv_model(debug=False):
+def _create_new_pwv_model(debug=False, pwv_data: Table = None):
     """Create a new model for the PWV level at the current site
 
     Create first order polynomials relating the PWV measured by the current
     site's supplementary receivers to its primary receiver (one per off site
     receiver). Use these polynomials to supplement PWV measurements taken by
     the primary receiver times when it is unavailable. Write the supplemented
-    PWV data to a csv file at settings._pwv_modeled_path.
+    PWV data to a csv file at settings._pwv_modeled_path (along with a binary
+    copy used for faster reads).
+
+    Args:
+        debug: Return the modeled data instead of writing it to file
+        pwv_data: Measured PWV data to use (Default: read from file)
     """
 
-    pwv_data = Table.read(settings._pwv_measured_path)
+    # Look up site settings once rather than on every use
+    primary_rec = settings.primary_rec
+    modeled_path = settings._pwv_modeled_path
+
+    if pwv_data is None:
+        pwv_data = _read_pwv_table(settings._pwv_measured_path)
+
     if not settings.supplement_rec:
-        pwv_data.rename_column(settings.primary_rec, 'pwv')
-        pwv_data.rename_column(settings.primary_rec + '_err', 'pwv_err')
-        return pwv_data.write(settings._pwv_modeled_path, overwrite=True)
+        pwv_data.rename_column(primary_rec, 'pwv')
+        pwv_data.rename_column(primary_rec + '_err', 'pwv_err')
+        return _write_pwv_table(pwv_data, modeled_path)
 
-    primary_rec = settings.primary_rec
     avg_pwv, avg_pwv_err = _calc_avg_pwv_model(pwv_data)
 
-    # Supplement primary data with averaged fits
-    mask = pwv_data[primary_rec].mask
-    sup_data = np.ma.where(mask, avg_pwv, pwv_data[primary_rec])
-    sup_err = np.ma.where(mask, avg_pwv_err, pwv_data[primary_rec + '_err'])
-    sup_data.mask = np.logical_and(mask, avg_pwv.mask)
-
-    # Remove any masked values
-    indices = ~sup_data.mask
+    # Supplement primary data with averaged fits. This is done on plain
+    # arrays since the result has no missing values to track.
+    primary_pwv = pwv_data[primary_rec]
+    mask = np.ma.getmaskarray(primary_pwv)
+    sup_data = np.where(mask, avg_pwv.data, primary_pwv.data)
+    sup_err = np.where(
+        mask, avg_pwv_err.data, pwv_data[primary_rec + '_err'].data)
+
+    # Remove dates without a measured or modeled value. Selecting the rows
+    # returns new arrays, so they are rounded in place.
+    indices = ~(mask & np.ma.getmaskarray(avg_pwv))
     dates = pwv_data['date'][indices]
-    sup_data = np.round(sup_data[indices], 3)
-    sup_err = np.round(sup_err[indices], 3)
+    sup_data = sup_data[indices]
+    sup_err = sup_err[indices]
+    np.round(sup_data, 3, out=sup_data)
+    np.round(sup_err, 3, out=sup_err)
 
     out = Table([dates, sup_data, sup_err], names=['date', 'pwv', 'pwv_err'])
     if debug:
         return out
 
-    out.write(settings._pwv_modeled_path, overwrite=True)
+    _write_pwv_table(out, modeled_path)
 
 
-def _get_years_to_download(years: list = None):
+def _get_years_to_download(years: list = None, available_years: list = None):
     """Return a list of years to download data for
 
     If the years argument is not provided, include all years from the earliest
@@ -174,34 +247,37 @@ def _get_years_to_download(years: list = None):
 
     Args:
         years: A list of years that a user is requesting to download
+        available_years: Years already downloaded (Default: read from settings)
 
     Returns:
         A list of years without data already on the current machine
     """
 
-    available_years = settings._downloaded_years
+    if available_years is None:
+        available_years = settings._downloaded_years
+
+    available_years = set(available_years)
     current_year = datetime.now().year
     if years is None:
         if not available_years:
             starting_year = 2010
-            ending_year = datetime.now().year
+            ending_year = current_year
 
         else:
             starting_year = min(available_years)
             ending_year = max(available_years)
 
         all_years = set(range(starting_year, current_year + 1))
-        download_years = all_years - set(available_years)
+        download_years = all_years - available_years
         download_years.add(ending_year)
 
     else:
-        if any((year > current_year for year in years)):
+        download_years = set(years)  # Avoid downloading a year twice
+        if download_years and max(download_years) > current_year:
             raise ValueError(
                 'Cannot update models for years greater than the current year.'
             )
 
-        download_years = years
-
     return sorted(download_years)
 
 
@@ -219,17 +295,31 @@ def update_models(years: list = None, timeout: float = None) -> list:
         timeout: Optional seconds to wait while connecting to SuomiNet
 
     Returns:
-        A list of years for which models where updated
+        A list of years for which models were updated
     """
 
-    download_years = _get_years_to_download(years)
+    # Read the downloaded years from the site config only once
+    downloaded_years = settings._downloaded_years
+    download_years = _get_years_to_download(years, downloaded_years)
 
+    # Merge data for each year in memory and write the measured table once
+    local_data = pwv_data = _get_local_data()
     updated_years = []
-    for year in download_years:
-        if update_local_data(year, timeout):
-            updated_years.append(year)
-
-    _create_new_pwv_model()
-    all_years = settings._downloaded_years + updated_years
+    try:
+        for year in download_years:
+            updated_data = _add_data_for_year(pwv_data, year, timeout)
+            if updated_data is not None:
+                pwv_data = updated_data
+                updated_years.append(year)
+
+    finally:
+        # Keep any data downloaded before an error was raised. Years that
+        # have not changed on SuomiNet do not require a new table.
+        if pwv_data is not local_data:
+            _write_pwv_table(pwv_data, settings._pwv_measured_path)
+
+    # Reuse the updated measurements instead of reading them back from file
+    _create_new_pwv_model(pwv_data=pwv_data if updated_years else None)
+    all_years = sorted(set(downloaded_years).union(updated_years))
     settings._replace_years(all_years)
     return updated_years
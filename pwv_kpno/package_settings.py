@@ -72,6 +72,7 @@ import json
 import os
 import shutil
 from datetime import datetime
+from functools import lru_cache
 from warnings import simplefilter, warn
 
 import numpy as np
@@ -88,6 +89,10 @@ _PROTECTED_NAMES = ['kitt_peak']
 _CUT_PARAMS = (
     'PWV', 'PWVerr', 'ZenithDelay', 'SrfcPress', 'SrfcTemp', 'SrfcRH')
 
+# Directory of the installed package. This is determined once on import so
+# creating Settings instances does not require resolving symlinks.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 def _calc_num_density_conversion():
     """Calculate conversion factor from PWV * cross section to optical depth
@@ -145,6 +150,22 @@ def create_pwv_atm_model(
     return out_table
 
 
+@lru_cache(maxsize=None)
+def _read_cross_sections(path: str) -> np.ndarray:
+    """Read and cache a file of cross sections distributed with the package
+
+    The returned array is shared between calls and should not be modified.
+
+    Args:
+        path: The path of the file to read
+
+    Returns:
+        A 2d array with one row for each column in the file
+    """
+
+    return np.genfromtxt(path).transpose()
+
+
 def site_property(f):
     # A custom wrapper that requires the _site_name attribute to not be None
     @property
@@ -180,12 +201,11 @@ class Settings(object):
     _config_data = None  # Data from the site's config file
 
     def __init__(self):
-        _file_dir = os.path.dirname(os.path.realpath(__file__))
-        self._suomi_dir = os.path.join(_file_dir, 'suomi_data')
-        self._loc_dir_unf = os.path.join(_file_dir, 'site_data/{}')
+        self._suomi_dir = os.path.join(_PACKAGE_DIR, 'suomi_data')
+        self._loc_dir_unf = os.path.join(_PACKAGE_DIR, 'site_data/{}')
         self._config_path_unf = os.path.join(self._loc_dir_unf, 'config.json')
 
-        atm_dir = os.path.join(_file_dir, 'default_atmosphere/')
+        atm_dir = os.path.join(_PACKAGE_DIR, 'default_atmosphere/')
         self._h2o_cs_path = os.path.join(atm_dir, 'h2ocs.txt')
         # self._o2_cs_path = os.path.join(atm_dir, 'o2cs.txt')
         # self._o3_cs_path = os.path.join(atm_dir, 'o3cs.txt')
@@ -236,11 +256,17 @@ class Settings(object):
     def _pwv_measured_path(self) -> str:
         return os.path.join(self._loc_dir, 'measured_pwv.csv')
 
+    @property
+    def _http_cache_path(self) -> str:
+        # HTTP cache headers for files downloaded into _suomi_dir
+        return os.path.join(self._suomi_dir, '.http_cache.json')
+
     @property
     def available_sites(self) -> list:
         """A list of sites for which pwv_kpno has stored settings"""
 
-        return next(os.walk(self._loc_dir_unf.format('')))[1]
+        with os.scandir(self._loc_dir_unf.format('')) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
 
     def set_site(self, loc: str):
         """Configure pwv_kpno to model the default_atmosphere at a given site
@@ -287,9 +313,9 @@ class Settings(object):
 
         try:
             timestamp_column = Table.read(self._pwv_measured_path)['date']
-            get_year = lambda t_stamp: datetime.utcfromtimestamp(t_stamp).year
-            get_year_vec = np.vectorize(get_year)
-            return np.unique(get_year_vec(timestamp_column))
+            dates = np.asarray(timestamp_column, dtype='int64')
+            years = dates.astype('datetime64[s]').astype('datetime64[Y]')
+            return np.unique(years.astype(int) + 1970)
 
         except FileNotFoundError:
             return np.array([])
@@ -300,7 +326,7 @@ class Settings(object):
         # Note: self._config_path calls @site_property decorator
         with open(self._config_path, 'r+') as ofile:
             current_data = json.load(ofile)
-            current_data['years'] = list(set(yr_list))
+            current_data['years'] = sorted(set(yr_list))
             ofile.seek(0)
             json.dump(current_data, ofile, indent=4, sort_keys=True)
             ofile.truncate()
@@ -513,12 +539,9 @@ class ConfigBuilder(object):
         self._data_cuts = dict()
 
         # Get the default MODTRAN cross sections used for Kitt Peak
-        settings_obj = Settings()
-        settings_obj.set_site('kitt_peak')
-        atm_cross_section = np.genfromtxt(
-            settings_obj._h2o_cs_path).transpose()
+        atm_cross_section = _read_cross_sections(Settings()._h2o_cs_path)
         self.wavelength = atm_cross_section[0] * 10000
-        self.cross_section = atm_cross_section[1]
+        self.cross_section = atm_cross_section[1].copy()
 
         # Assign any passed arguments to attributes
         for key, value in kwargs.items():
@@ -85,21 +85,64 @@ An incomplete guide to getting started:
 """
 
 import os
+import re
+from collections import defaultdict
 from datetime import datetime
-from glob import glob
+from functools import lru_cache
 from typing import List, Tuple, Union
 
 import numpy as np
-from astropy.table import Table, unique, vstack
+from astropy.table import Table, vstack
 from astropy.time import Time
 from pytz import utc
 from scipy.stats import binned_statistic
 
-from ._download_pwv_data import _read_file
+from ._download_pwv_data import _read_file, _read_pwv_table
 from ._update_pwv_model import update_models
 from .package_settings import settings
 
 
+@lru_cache(maxsize=4)
+def _read_cached_table(path: str, mtime: int, size: int) -> Table:
+    """Cached wrapper around _read_pwv_table keyed by file modification time
+
+    Units of mm are assigned to all PWV columns when the table is read, so
+    they are carried along by any rows selected from the cached table.
+
+    Args:
+        path: The path of the csv file to read
+        mtime: The modification time of path in nanoseconds
+        size: The size of path in bytes
+
+    Returns:
+        An astropy Table with data from path
+    """
+
+    data = _read_pwv_table(path)
+    for colname in data.colnames:
+        if colname != 'date':
+            data[colname].unit = 'mm'
+
+    return data
+
+
+def _load_pwv_table(path: str) -> Table:
+    """Read a table of PWV data, reusing the result of previous reads
+
+    The cached table is shared between calls and should not be modified.
+    It is automatically reloaded if the file changes on disk.
+
+    Args:
+        path: The path of the csv file to read
+
+    Returns:
+        An astropy Table with data from path
+    """
+
+    file_stats = os.stat(path)
+    return _read_cached_table(path, file_stats.st_mtime_ns, file_stats.st_size)
+
+
 def _warn_available_data(
         test_dates: Union[float, np.array],
         dates_with_data: np.array) -> None:
@@ -107,7 +150,7 @@ def _warn_available_data(
 
     Args:
         test_dates: Dates to check for available data
-        dates_with_data: Dates with data available
+        dates_with_data: Sorted dates with data available
     """
 
     test_dates = np.atleast_1d(test_dates)  # In case passed a float
@@ -115,15 +158,17 @@ def _warn_available_data(
         err_msg = 'No PWV data for primary receiver available on local machine.'
         raise RuntimeError(err_msg)
 
-    # Check date falls within the range of available PWV data
-    min_known_date = dates_with_data.min(),
+    # Check date falls within the range of available PWV data. Since the
+    # dates are sorted, the range is given by the first and last values
+    # without scanning the full column on every call.
+    min_known_date = dates_with_data[0]
     if (test_dates < min_known_date).any():
         min_date = datetime.utcfromtimestamp(min_known_date)
         raise ValueError(
             f'No PWV data found for dates before {min_date} on local machine'
         )
 
-    max_known_date = dates_with_data.max()
+    max_known_date = dates_with_data[-1]
     if (test_dates > max_known_date).any():
         max_date = datetime.utcfromtimestamp(max_known_date)
         raise ValueError(
@@ -167,12 +212,19 @@ def _pwv_date(
     """
 
     if test_model is None:
-        pwv_model = Table.read(settings._pwv_modeled_path)
+        pwv_model = _load_pwv_table(settings._pwv_modeled_path)
 
     else:
         pwv_model = test_model
 
-    time_stamp = Time(date, format=format).to_value('unix')
+    # UNIX timestamps are used directly instead of converting them to and
+    # from an astropy Time object
+    if format == 'unix':
+        time_stamp = np.asarray(date, dtype=float)
+
+    else:
+        time_stamp = Time(date, format=format).to_value('unix')
+
     _warn_available_data(time_stamp, pwv_model['date'])
 
     pwv = np.interp(time_stamp, pwv_model['date'], pwv_model['pwv'])
@@ -245,38 +297,153 @@ def _check_date_time_args(
             raise ValueError('Invalid value for {0}: {1}'.format(arg, value))
 
 
+def _date_range(year: int, month: int = None, day: int = None,
+                hour: int = None) -> Union[Tuple[int, int], None]:
+    """Return the span of UNIX timestamps covered by a given date
+
+    The date is specified to a resolution set by the last argument that is
+    not None. For example, if only a year and month are given the span
+    covers that entire month.
+
+    Args:
+        year: The year of the date
+        month: The month of the date
+        day: The day of the date
+        hour: The hour of the date
+
+    Returns:
+        The first timestamp in the span and the first timestamp after it, or
+        None if the date does not exist (e.g. February 30th)
+    """
+
+    start = np.datetime64(year - 1970, 'Y')
+    step = np.timedelta64(1, 'Y')
+    if month is not None:
+        start = start.astype('datetime64[M]') + (month - 1)
+        step = np.timedelta64(1, 'M')
+
+    if day is not None:
+        first_of_month = start
+        start = start.astype('datetime64[D]') + (day - 1)
+        step = np.timedelta64(1, 'D')
+        if start.astype('datetime64[M]') != first_of_month:
+            return None
+
+    if hour is not None:
+        start = start.astype('datetime64[h]') + hour
+        step = np.timedelta64(1, 'h')
+
+    bounds = np.array([start, start + step]).astype('datetime64[s]')
+    return tuple(bounds.astype('int64'))
+
+
 def _search_data_table(data_tab: Table, **kwargs):
     """Search an astropy table of dates
 
-    Given an astropy table with column 'date', return all entries in the table
-    for which there is an object in that column with attributes matching the
-    given kwargs.
-
-    Credit for this function belongs to Alexander Afanasyev
-    https://codereview.stackexchange.com/questions/165811
+    Given an astropy table with a column 'date' of UNIX timestamps, return all
+    entries in the table with a UTC year, month, day, and hour matching the
+    given kwargs. Arguments with a value of ``None`` are ignored. The returned
+    table is always a copy of the data in data_tab.
 
     Args:
-        data_tab: An astropy table to search
+        data_tab: An astropy table sorted by date to search
         **kwargs: The parameters to search data_tab for
 
     Returns:
         Entries from data_tab that match search parameters
     """
 
-    def vectorized_callable(obj):
-        """Checks if datetime attributes match specified values"""
-        return all(getattr(obj, param_name) == param_value
-                   for param_name, param_value in kwargs.items()
-                   if param_value is not None)
+    date_args = [kwargs.get(arg) for arg in ('year', 'month', 'day', 'hour')]
+    num_args = sum(arg is not None for arg in date_args)
+
+    # If the date is given from the year down to some resolution, the
+    # matching rows form one contiguous block of the sorted table
+    if num_args and None not in date_args[:num_args]:
+        date_range = _date_range(*date_args[:num_args])
+        if date_range is None:
+            return data_tab[:0].copy()
+
+        start, stop = np.searchsorted(data_tab['date'], date_range)
+        return data_tab[start:stop].copy()
 
-    indexing_func = np.vectorize(vectorized_callable)
-    return data_tab[np.where(indexing_func(data_tab['date']))[0]]
+    # Date components are calculated from the timestamps only as needed.
+    # The month of each timestamp is shared by the year, month, and day
+    # components, so it is calculated at most once.
+    search_args = {arg: value for arg, value in kwargs.items()
+                   if value is not None}
+
+    timestamps = np.asarray(data_tab['date'], dtype='int64')
+    if search_args.keys() & {'year', 'month', 'day'}:
+        months = timestamps.astype('datetime64[s]').astype('datetime64[M]')
+
+    date_components = {
+        'year': lambda: months.astype('datetime64[Y]').astype(int) + 1970,
+        'month': lambda: months.astype(int) % 12 + 1,
+        'day': lambda: (timestamps // 86400 -
+                        months.astype('datetime64[D]').astype(int) + 1),
+        'hour': lambda: timestamps // 3600 % 24
+    }
+
+    mask = np.ones(len(timestamps), dtype=bool)
+    for param_name, param_value in search_args.items():
+        mask &= date_components[param_name]() == param_value
+
+    return data_tab[mask]
+
+
+def _timestamps_to_datetimes(timestamps: np.array) -> np.array:
+    """Convert UNIX timestamps to timezone aware datetime objects in UTC
+
+    Args:
+        timestamps: An array of UNIX timestamps
+
+    Returns:
+        An array of datetime objects
+    """
+
+    microseconds = np.rint(np.asarray(timestamps, dtype=float) * 1e6)
+    naive_dates = microseconds.astype('datetime64[us]').astype(object)
+    attach_utc = np.frompyfunc(lambda date: date.replace(tzinfo=utc), 1, 1)
+    return attach_utc(naive_dates).astype(object)
+
+
+@lru_cache(maxsize=32)
+def _search_cached_table(path: str, mtime: int, size: int, year: int,
+                         month: int, day: int, hour: int) -> Table:
+    """Cached search of a PWV data table with dates converted to datetimes
+
+    The returned table is shared between calls and should not be modified.
+
+    Args:
+        path: The path of the file to read
+        mtime: The modification time of path in nanoseconds
+        size: The size of path in bytes
+        year: An integer value between 2010 and the current year
+        month: An integer value between 1 and 12 (inclusive)
+        day: An integer value between 1 and 31 (inclusive)
+        hour: An integer value between 0 and 23 (inclusive)
+
+    Returns:
+        An astropy table with PWV data
+    """
+
+    # Search on timestamps so only the matching rows are converted to datetimes
+    # Searching also returns a copy, leaving the cached table unchanged
+    data = _search_data_table(
+        _read_cached_table(path, mtime, size),
+        year=year, month=month, day=day, hour=hour
+    )
+
+    data['date'] = _timestamps_to_datetimes(data['date'])
+    data['date'].unit = 'UTC'
+    return data
 
 
 def _get_pwv_data_table(path: str, year: int, month: int, day: int, hour: int):
     """Reads a PWV data table from file and formats the table and data
 
     Adds units and converts 'date' column from timestamps to datetimes.
+    Results of previous calls are reused while the file is unchanged.
 
     Args:
         path: The path of the file to read
@@ -290,25 +457,19 @@ def _get_pwv_data_table(path: str, year: int, month: int, day: int, hour: int):
     """
 
     _check_date_time_args(year, month, day, hour)
-    if not os.path.exists(path):
-        raise RuntimeError('No data downloaded for current location.')
-
-    data = Table.read(path)
-    if data:
-        # vectorized callable can not be used on an empty table
-        to_datetime = lambda date: datetime.fromtimestamp(date, utc)
-        data['date'] = np.vectorize(to_datetime)(data['date'])
-        data['date'].unit = 'UTC'
+    try:
+        file_stats = os.stat(path)
 
-        data = _search_data_table(
-            data, year=year, month=month, day=day, hour=hour
-        )
+    except FileNotFoundError:
+        raise RuntimeError('No data downloaded for current location.')
 
-    for colname in data.colnames:
-        if colname != 'date':
-            data[colname].unit = 'mm'
+    # Cached results are shared, so callers are given a copy
+    data = _search_cached_table(
+        path, file_stats.st_mtime_ns, file_stats.st_size,
+        year, month, day, hour
+    )
 
-    return data
+    return data.copy()
 
 
 def measured_pwv(year: int = None, month: int = None, day: int = None,
@@ -330,7 +491,8 @@ def measured_pwv(year: int = None, month: int = None, day: int = None,
     """
 
     # Specify the order of returned columns
-    col_order = ['date', settings.primary_rec, settings.primary_rec + '_err']
+    primary_rec = settings.primary_rec
+    col_order = ['date', primary_rec, primary_rec + '_err']
     for receiver in settings.supplement_rec:
         col_order.append(receiver)
         col_order.append(receiver + '_err')
@@ -534,31 +696,38 @@ def get_all_receiver_data(receiver_id: str, apply_cuts: bool = True):
         err_msg = 'Receiver is not part of currently modeled site: {}'
         raise ValueError(err_msg.format(receiver_id))
 
-    out_table = None
+    # List the data directory once and group file paths by year using a
+    # single pre-compiled pattern for <receiver_id><release>_<year>.plt
+    file_pattern = re.compile(re.escape(receiver_id) + r'.*_\d{4}\.plt')
+    with os.scandir(settings._suomi_dir) as entries:
+        paths = [entry.path for entry in entries
+                 if file_pattern.fullmatch(entry.name)]
+
+    # Sorting ensures that daily data releases take precedent over
+    # hourly data releases. We are not concerned here with the global
+    # data releases, since they do not have two published data sets.
+    # Sorting once before grouping keeps the paths for each year sorted.
+    paths_by_year = defaultdict(list)
+    for path in sorted(paths):
+        paths_by_year[path[-8:-4]].append(path)
+
+    # Tables for each year are collected and stacked together only once
+    year_tables = []
     for year in settings._downloaded_years:
-        path_pattern = os.path.join(settings._suomi_dir, '{}*_{}.plt')
-        path_pattern = path_pattern.format(receiver_id, year)
-
-        # Sorting ensures that daily data releases take precedent over
-        # hourly data releases. We are not concerned here with the global
-        # data releases, since they do not have two published data sets
-        path_list = sorted(glob(path_pattern))
+        path_list = paths_by_year.get(str(year), [])
         table_list = [_read_file(path, apply_cuts, False) for path in
                       path_list]
 
         if table_list and any(table_list):
-            data_for_year = unique(
-                vstack(table_list),
-                keep='first',
-                keys=['date']
-            )
+            data_for_year = vstack(table_list)
 
-            if out_table is None:
-                out_table = data_for_year
+            # Keep the first occurrence of each date (sorted by date)
+            _, first_index = np.unique(
+                data_for_year['date'], return_index=True)
 
-            else:
-                out_table = vstack([out_table, data_for_year])
+            year_tables.append(data_for_year[first_index])
 
+    out_table = vstack(year_tables)
     out_table.rename_column(receiver_id, 'PWV')
     out_table.rename_column(receiver_id + '_err', 'PWV_err')
     return out_table
@@ -20,16 +20,31 @@
 data is downloaded and parsed correctly.
 """
 
+import io
 import os
 import warnings
 from datetime import datetime
+from email.utils import formatdate
+from tempfile import TemporaryDirectory
 from unittest import TestCase, skipIf
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import requests
+from astropy.table import MaskedColumn, Table
 from pytz import utc
 
+from pwv_kpno import _download_pwv_data
+from pwv_kpno._download_pwv_data import _add_data_for_year
+from pwv_kpno._download_pwv_data import _conditional_headers
 from pwv_kpno._download_pwv_data import _download_data_for_year
+from pwv_kpno._download_pwv_data import _download_file
+from pwv_kpno._download_pwv_data import _has_data_for_year
+from pwv_kpno._download_pwv_data import _in_intervals
+from pwv_kpno._download_pwv_data import _mask_missing_values
 from pwv_kpno._download_pwv_data import _read_file
+from pwv_kpno._download_pwv_data import _read_pwv_table
+from pwv_kpno._download_pwv_data import _write_pwv_table
 from pwv_kpno._download_pwv_data import _suomi_date_to_timestamp
 from pwv_kpno.package_settings import settings
 
@@ -126,6 +141,16 @@ class DateFormatConversion(TestCase):
                          dec_31_2021_23_15.timestamp(),
                          error_msg.format(dec_31_2021_23_15))
 
+    def test_array_conversion(self):
+        """Test array conversion matches converting dates individually"""
+
+        days = ['1.01042', '1.05208', '1.11458', '1.17708', '36.01042',
+                '365.96875']
+
+        expected = [_suomi_date_to_timestamp(2010, day) for day in days]
+        returned = _suomi_date_to_timestamp(2010, np.array(days, float))
+        self.assertListEqual(list(returned), expected)
+
 
 class SuomiNetFileParsing(TestCase):
     """Test file parsing by create_pwv_models._read_file"""
@@ -177,6 +202,14 @@ class SuomiNetFileParsing(TestCase):
         self.assertFalse(is_negative_azam_data, msg.format(self.azam_hr_path))
         self.assertFalse(is_negative_p014_data, msg.format(self.p014_dy_path))
 
+    def test_auxiliary_columns_double_precision(self):
+        """Test columns returned to the user are parsed as double precision"""
+
+        path = os.path.join(settings._suomi_dir, self.kitt_hr_path)
+        data = _read_file(path, apply_cuts=False, pwv_only=False)
+        for colname in ('ZenithDelay', 'SrfcPress', 'SrfcTemp', 'SrfcRH'):
+            self.assertEqual(data[colname].dtype, np.float64)
+
     @staticmethod
     def test_parse_2010_data():
         """Test file parsing of SuomiNet data published in 2010
@@ -188,3 +221,302 @@ class SuomiNetFileParsing(TestCase):
 
         hr_path = os.path.join(settings._suomi_dir, 'SA48dy_2010.plt')
         _read_file(hr_path)
+
+
+class DateCutIntervals(TestCase):
+    """Tests for the interval search used by date based data cuts"""
+
+    def test_overlapping_intervals(self):
+        """Test values are matched against unsorted, overlapping intervals"""
+
+        values = np.arange(12, dtype=float)
+        intervals = [[6, 9], [1, 5], [2, 3]]
+        expected = [False, False, True, True, True, False,
+                    False, True, True, False, False, False]
+
+        returned = _in_intervals(values, intervals)
+        self.assertListEqual(list(returned), expected)
+
+    def test_no_intervals(self):
+        """Test no values are matched if there are no intervals"""
+
+        self.assertFalse(_in_intervals(np.arange(5.), []).any())
+
+
+class PwvTableIO(TestCase):
+    """Test tables written by _write_pwv_table are read by _read_pwv_table"""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, 'measured_pwv.csv')
+        self.fits_path = os.path.join(self.temp_dir.name, 'measured_pwv.fits')
+
+        pwv = np.ma.array([1.2, 2.3, 3.4], mask=[0, 1, 0])
+        self.data = Table([[1., 2., 3.], pwv], names=['date', 'KITT'])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_binary_copy_written(self):
+        """Test a binary copy of the table is written next to the csv"""
+
+        _write_pwv_table(self.data, self.csv_path)
+        self.assertTrue(os.path.exists(self.csv_path))
+        self.assertTrue(os.path.exists(self.fits_path))
+
+    def test_round_trip(self):
+        """Test data and masks are preserved when reading the binary copy"""
+
+        _write_pwv_table(self.data, self.csv_path)
+        data = _read_pwv_table(self.csv_path)
+
+        self.assertEqual(data.colnames, self.data.colnames)
+        self.assertListEqual(list(data['KITT'].mask), [False, True, False])
+        self.assertTrue(np.array_equal(data['date'], self.data['date']))
+
+    def test_unmasked_nan_values(self):
+        """Test NaN values are masked if astropy does not mask them on read"""
+
+        # Older versions of astropy read missing values as unmasked NaNs
+        data = Table([[1., 2., 3.], [1.2, np.nan, 3.4]],
+                     names=['date', 'KITT'], masked=False)
+        data = _mask_missing_values(data)
+
+        self.assertListEqual(list(data['KITT'].mask), [False, True, False])
+        self.assertNotIsInstance(data['date'], MaskedColumn)
+
+    def test_stale_binary_copy_ignored(self):
+        """Test the csv file is read if it is newer than the binary copy"""
+
+        _write_pwv_table(self.data, self.csv_path)
+        self.data[:2].write(self.csv_path, overwrite=True)
+        os.utime(self.fits_path, (0, 0))
+
+        self.assertEqual(len(_read_pwv_table(self.csv_path)), 2)
+
+
+def _mock_response(status_code: int = 200, content: bytes = b'',
+                   headers: dict = None):
+    """Return a mock of a streamed response from the requests package
+
+    Args:
+        status_code: The HTTP status code of the response
+        content: The body of the response
+        headers: The response headers
+
+    Returns:
+        A MagicMock that can be returned by _SESSION.get
+    """
+
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = status_code
+    response.headers = {'Content-Length': str(len(content))}
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(content)
+    return response
+
+
+def _write_local_file(path: str, content: bytes = b'old'):
+    """Write a local copy of a file being downloaded
+
+    Args:
+        path: The path of the file to write
+        content: The content of the file
+    """
+
+    with open(path, 'wb') as ofile:
+        ofile.write(content)
+
+
+class FileDownload(TestCase):
+    """Tests for downloading individual files with _download_file"""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'KITThr_2016.plt')
+        self.url = 'https://www.suominet.ucar.edu/KITTnrt_2016.plt'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def download(self, response, http_cache=None):
+        """Call _download_file with a mocked server response"""
+
+        with patch.object(_download_pwv_data._SESSION, 'get',
+                          return_value=response):
+            return _download_file(self.url, self.path, http_cache=http_cache)
+
+    def test_successful_download(self):
+        """Test downloaded data is written to disk and its headers cached"""
+
+        last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+        response = _mock_response(
+            content=b'new data',
+            headers={'ETag': '"1"', 'Last-Modified': last_modified})
+
+        http_cache = dict()
+        self.assertEqual(self.download(response, http_cache), 200)
+        with open(self.path, 'rb') as ifile:
+            self.assertEqual(ifile.read(), b'new data')
+
+        expected_cache = {'etag': '"1"', 'last_modified': last_modified,
+                          'size': 8}
+        self.assertEqual(http_cache['KITThr_2016.plt'], expected_cache)
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    def test_mtime_from_last_modified(self):
+        """Test the file modification time matches the server's copy"""
+
+        last_modified = formatdate(1445412480, usegmt=True)
+        response = _mock_response(headers={'Last-Modified': last_modified})
+        self.download(response)
+        self.assertEqual(os.path.getmtime(self.path), 1445412480)
+
+    def test_not_modified_or_missing(self):
+        """Test 304 and 404 responses leave the local file unchanged"""
+
+        _write_local_file(self.path)
+        for status_code in (304, 404):
+            http_cache = dict()
+            response = _mock_response(status_code, content=b'new data')
+            self.assertEqual(self.download(response, http_cache), status_code)
+            self.assertEqual(http_cache, dict())
+
+            with open(self.path, 'rb') as ifile:
+                self.assertEqual(ifile.read(), b'old')
+
+    def test_interrupted_download(self):
+        """Test a failed download removes its partial file"""
+
+        _write_local_file(self.path)
+        response = _mock_response(content=b'new data')
+        response.raw = MagicMock()
+        response.raw.read.side_effect = [b'new', ConnectionError()]
+
+        self.assertRaises(ConnectionError, self.download, response)
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        with open(self.path, 'rb') as ifile:
+            self.assertEqual(ifile.read(), b'old')
+
+    def test_truncated_download(self):
+        """Test a short response body raises an error and is not cached"""
+
+        response = _mock_response(content=b'abc', headers={'ETag': '"1"'})
+        response.headers['Content-Length'] = '10'
+        http_cache = dict()
+
+        self.assertRaises(IOError, self.download, response, http_cache)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        self.assertEqual(http_cache, dict())
+
+
+class ConditionalHeaders(TestCase):
+    """Tests for the request headers returned by _conditional_headers"""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'KITThr_2016.plt')
+        self.cached = {'etag': '"1"',
+                       'last_modified': 'Wed, 21 Oct 2015 07:28:00 GMT',
+                       'size': 3}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_missing_file(self):
+        """Test no conditional headers are sent for files not on disk"""
+
+        http_cache = {'KITThr_2016.plt': self.cached}
+        headers = _conditional_headers(self.path, http_cache)
+        self.assertNotIn('If-None-Match', headers)
+        self.assertNotIn('If-Modified-Since', headers)
+
+    def test_cached_headers(self):
+        """Test cached ETag and Last-Modified values are sent"""
+
+        _write_local_file(self.path)
+        http_cache = {'KITThr_2016.plt': self.cached}
+        headers = _conditional_headers(self.path, http_cache)
+        self.assertEqual(headers['If-None-Match'], self.cached['etag'])
+        self.assertEqual(
+            headers['If-Modified-Since'], self.cached['last_modified'])
+
+    def test_size_mismatch(self):
+        """Test no conditional headers are sent if the file size changed"""
+
+        _write_local_file(self.path, b'changed')
+        http_cache = {'KITThr_2016.plt': self.cached}
+        headers = _conditional_headers(self.path, http_cache)
+        self.assertNotIn('If-None-Match', headers)
+        self.assertNotIn('If-Modified-Since', headers)
+
+    def test_uncached_file(self):
+        """Test no conditional headers are sent for files without a cache"""
+
+        _write_local_file(self.path)
+        os.utime(self.path, (1445412480, 1445412480))
+        headers = _conditional_headers(self.path, dict())
+        self.assertNotIn('If-None-Match', headers)
+        self.assertNotIn('If-Modified-Since', headers)
+
+
+class AddDataForYear(TestCase):
+    """Tests for merging a year of SuomiNet data into local measurements"""
+
+    def setUp(self):
+        # Timestamps for 2016-01-01, 2016-06-01 and 2017-01-01 (UTC)
+        self.local_data = Table(
+            [[1451606400., 1464739200., 1483228800.], [1., 2., 3.]],
+            names=['date', 'KITT'])
+
+    def test_has_data_for_year(self):
+        """Test years are identified using the start of each year"""
+
+        self.assertTrue(_has_data_for_year(self.local_data, 2016))
+        self.assertTrue(_has_data_for_year(self.local_data, 2017))
+        self.assertFalse(_has_data_for_year(self.local_data, 2015))
+        self.assertFalse(_has_data_for_year(self.local_data[:0], 2016))
+
+    @patch('pwv_kpno._download_pwv_data._download_data_for_year')
+    def test_new_data_replaces_old(self, mock_download):
+        """Test new rows replace local rows with the same date"""
+
+        mock_download.return_value = Table(
+            [[1451606400., 1464739200.], [4., 5.]], names=['date', 'KITT'])
+
+        updated_data = _add_data_for_year(self.local_data, 2016)
+        self.assertListEqual(list(updated_data['KITT']), [4., 5., 3.])
+        self.assertEqual(len(self.local_data), 3)
+
+    @patch('pwv_kpno._download_pwv_data._download_data_for_year')
+    def test_sorted_by_date(self, mock_download):
+        """Test the merged table is sorted by date"""
+
+        mock_download.return_value = Table(
+            [[1483315200., 1456790400.], [4., 5.]], names=['date', 'KITT'])
+
+        updated_data = _add_data_for_year(self.local_data, 2016)
+        dates = np.asarray(updated_data['date'])
+        self.assertEqual(len(dates), 5)
+        self.assertTrue(np.all(np.diff(dates) > 0))
+
+    @patch('pwv_kpno._download_pwv_data._download_data_for_year')
+    def test_unmodified_year_skipped(self, mock_download):
+        """Test local data is returned unchanged if no files were modified"""
+
+        mock_download.return_value = None
+
+        updated_data = _add_data_for_year(self.local_data, 2016)
+        self.assertIs(updated_data, self.local_data)
+        self.assertTrue(mock_download.call_args[1]['skip_unmodified'])
+
+    @patch('pwv_kpno._download_pwv_data._download_data_for_year')
+    def test_missing_year_not_skipped(self, mock_download):
+        """Test unmodified files are parsed for years without local data"""
+
+        mock_download.return_value = Table()
+
+        self.assertIsNone(_add_data_for_year(self.local_data[:0], 2015))
+        self.assertFalse(mock_download.call_args[1]['skip_unmodified'])
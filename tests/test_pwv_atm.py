@@ -132,6 +132,16 @@ class MeasuredPWV(TestCase):
             else:
                 self.assertEqual(column.unit, 'mm')
 
+    def test_returned_table_is_copy(self):
+        """Test modifying returned data does not change later results"""
+
+        data = pwv_atm.measured_pwv(year=2010)
+        expected_pwv = np.array(data['KITT'])
+        data['KITT'] = -1
+
+        new_pwv = np.array(pwv_atm.measured_pwv(year=2010)['KITT'])
+        np.testing.assert_array_equal(new_pwv, expected_pwv)
+
 
 class ModeledPWV(TestCase):
     """Tests for the 'pwv_atm.modeled_pwv' function"""
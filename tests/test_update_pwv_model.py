@@ -21,13 +21,18 @@
 import warnings
 from datetime import datetime
 from unittest import TestCase
+from unittest.mock import patch
 
 import numpy as np
 import requests
+from astropy.table import MaskedColumn, Table
 
+from pwv_kpno._update_pwv_model import _calc_avg_pwv_model
 from pwv_kpno._update_pwv_model import _create_new_pwv_model
+from pwv_kpno._update_pwv_model import _fit_line
 from pwv_kpno._update_pwv_model import _linear_regression
 from pwv_kpno._update_pwv_model import update_models
+from pwv_kpno.package_settings import settings
 
 try:
     with warnings.catch_warnings():
@@ -72,6 +77,97 @@ class LinearRegression(TestCase):
         fit_matches_data = np.all(np.isclose(y, fit))
         self.assertTrue(fit_matches_data)
 
+    def test_fit_uses_plain_arrays(self):
+        """Test masked columns are fit without masked array arithmetic"""
+
+        x = MaskedColumn([1., 3., 5., 7.], mask=[0, 0, 1, 0])
+        y = MaskedColumn([7., 17., 27., 37.], mask=[0, 0, 0, 0])
+        sy = sx = np.zeros(len(x)) + .1
+
+        with patch('pwv_kpno._update_pwv_model._fit_line',
+                   wraps=_fit_line) as fit_line:
+            _linear_regression(x, y, sx, sy)
+
+        for argument in fit_line.call_args[0]:
+            self.assertNotIsInstance(argument, np.ma.MaskedArray)
+
+    def test_no_overlapping_data(self):
+        """Test a zero error is returned when x and y never overlap"""
+
+        x = np.ma.array([1., 2., 3., 4.], mask=[0, 0, 1, 1])
+        y = np.ma.array([1., 2., 3., 4.], mask=[1, 1, 0, 0])
+        sy = sx = np.zeros(x.shape) + .1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            fit, fit_err = _linear_regression(x, y, sx, sy)
+
+        self.assertTrue(np.array_equal(fit.mask, fit_err.mask))
+        self.assertTrue(np.all(fit_err.compressed() == 0))
+
+
+class FitLine(TestCase):
+    """Tests for pwv_kpno._update_pwv_model._fit_line"""
+
+    def test_york_reference_data(self):
+        """Test the fit of Pearson's data with York's weights
+
+        Expected values are taken from York et al. (2004), Am. J. Phys. 72,
+        367, which uses the same weighted orthogonal distance regression.
+        """
+
+        x = np.array([0.0, 0.9, 1.8, 2.6, 3.3, 4.4, 5.2, 6.1, 6.5, 7.4])
+        y = np.array([5.9, 5.4, 4.4, 4.6, 3.5, 3.7, 2.8, 2.8, 2.4, 1.5])
+        weight_x = np.array(
+            [1000, 1000, 500, 800, 200, 80, 60, 20, 1.8, 1])
+        weight_y = np.array([1, 1.8, 4, 8, 20, 20, 70, 70, 100, 500])
+
+        intercept, slope = _fit_line(
+            x, y, 1 / np.sqrt(weight_x), 1 / np.sqrt(weight_y))
+
+        self.assertAlmostEqual(intercept, 5.4799, places=4)
+        self.assertAlmostEqual(slope, -0.4805, places=4)
+
+    def test_matches_scipy_odr(self):
+        """Test the fit agrees with scipy.odr for noisy data"""
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # scipy.odr is deprecated
+            from scipy.odr import ODR, RealData, polynomial
+
+        random_state = np.random.RandomState(0)
+        x_true = np.linspace(1, 20, 50)
+        sx = random_state.uniform(.1, 1, 50)
+        sy = random_state.uniform(.1, 2, 50)
+        x = x_true + random_state.normal(0, sx)
+        y = 2 + .5 * x_true + random_state.normal(0, sy)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            odr_data = RealData(x, y, sx=sx, sy=sy)
+            odr_fit = ODR(odr_data, polynomial(1), beta0=[0., 1.]).run()
+
+        np.testing.assert_allclose(
+            _fit_line(x, y, sx, sy), odr_fit.beta, rtol=1e-5)
+
+    def test_insufficient_data(self):
+        """Test the initial guess is returned for fewer than two points"""
+
+        for num_points in (0, 1):
+            data = np.ones(num_points)
+            self.assertEqual(_fit_line(data, data, data, data), (0., 1.))
+
+    def test_numerical_error(self):
+        """Test an error is raised if the fit is not finite"""
+
+        x = np.ones(5)
+        y = np.arange(5.)
+        errors = np.full(5, .1)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.assertRaises(RuntimeError, _fit_line, x, y, errors, errors)
+
 
 class CalcAvgPwvModel(TestCase):
     """Tests for pwv_kpno._update_pwv_model._create_new_pwv_model"""
@@ -83,6 +179,26 @@ class CalcAvgPwvModel(TestCase):
         are_negative_values = np.any(model['pwv'] <= 0)
         self.assertFalse(are_negative_values)
 
+    def test_input_data_unchanged(self):
+        """Test the passed PWV data is not modified in place"""
+
+        # Without primary data the regression returns the primary error
+        # column itself, which has no masked values here
+        primary_rec = settings.primary_rec
+        pwv_data = Table()
+        pwv_data['date'] = np.arange(5.)
+        pwv_data[primary_rec] = MaskedColumn(np.ones(5), mask=True)
+        pwv_data[primary_rec + '_err'] = np.full(5, 2.)
+        for receiver in settings.supplement_rec:
+            pwv_data[receiver] = np.ones(5)
+            pwv_data[receiver + '_err'] = np.full(5, 2.)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            _calc_avg_pwv_model(pwv_data)
+
+        np.testing.assert_array_equal(pwv_data[primary_rec + '_err'], 2.)
+
 
 class UpdateModelsArgs(TestCase):
     """Test update_models function for raised errors due to bad arguments"""
@@ -100,3 +216,21 @@ class UpdateModelsArgs(TestCase):
 
         years_list = update_models([])
         self.assertCountEqual(years_list, [])
+
+    @patch('pwv_kpno._update_pwv_model.settings')
+    @patch('pwv_kpno._update_pwv_model._create_new_pwv_model')
+    @patch('pwv_kpno._update_pwv_model._write_pwv_table')
+    @patch('pwv_kpno._update_pwv_model._add_data_for_year')
+    @patch('pwv_kpno._update_pwv_model._get_local_data')
+    def test_unmodified_years_returned(
+            self, mock_local, mock_add, mock_write, mock_model, mock_settings):
+        """Test requested years are returned if their data is unchanged"""
+
+        local_data = Table([[1451606400.]], names=['date'])
+        mock_local.return_value = local_data
+        mock_add.return_value = local_data
+        mock_settings._downloaded_years = [2016]
+
+        self.assertListEqual(update_models([2016]), [2016])
+        mock_write.assert_not_called()
+        mock_model.assert_called_once_with(pwv_data=local_data)